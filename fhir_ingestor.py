@@ -5,15 +5,25 @@ Ingests FHIR resources from files or HTTP endpoint, ensuring patientId linking
 """
 
 import os
+import sys
 import json
+import time
 import logging
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Iterable, Iterator, Callable, Union
 from datetime import datetime
 import re
-from flask import Flask, request, jsonify
-from pymongo import MongoClient, UpdateOne
-from pymongo.errors import BulkWriteError
+from collections import defaultdict
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import asynccontextmanager
+import ijson
+import orjson
+import uvicorn
+from fastapi import FastAPI, Request, Response
+from pymongo import MongoClient, AsyncMongoClient, ReplaceOne, InsertOne, WriteConcern
+from pymongo.errors import BulkWriteError, CollectionInvalid, OperationFailure
+from pymongo.results import BulkWriteResult
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -26,6 +36,36 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Files at or above this size are parsed incrementally instead of in one read
+STREAM_THRESHOLD_BYTES = 1024 * 1024
+
+# Name MongoDB assigns to the unique (resourceType, id) upsert index
+UPSERT_INDEX_NAME = 'resourceType_1_id_1'
+
+# MongoDB server error code for a unique index violation
+DUPLICATE_KEY_ERROR = 11000
+
+# Reference prefixes, sliced off directly instead of split on '/'
+PATIENT_PREFIX = 'Patient/'
+PATIENT_PLEN = len(PATIENT_PREFIX)
+ENCOUNTER_PREFIX = 'Encounter/'
+ENCOUNTER_PLEN = len(ENCOUNTER_PREFIX)
+
+# Buffered dead letters from single-resource processing are flushed at this size
+DEAD_LETTER_BUFFER_SIZE = 500
+
+# Unacknowledged writes may still be applying when the load returns, so
+# fast load verification re-counts until two passes agree or it times out
+FAST_LOAD_SETTLE_TIMEOUT = 30
+FAST_LOAD_SETTLE_INTERVAL = 0.5
+
+# WiredTiger options for collections created by the ingestor
+ZSTD_STORAGE_ENGINE = {'wiredTiger': {'configString': 'block_compressor=zstd'}}
+
+# Key paths searched, in priority order, for a Patient reference
+PATIENT_REF_PATHS = (('subject', 'reference'), ('patient', 'reference'))
+ENCOUNTER_PATIENT_REF_PATHS = PATIENT_REF_PATHS + (('encounter', 'subject', 'reference'),)
+
 class FHIRIngestor:
     """FHIR R4 Resource Ingestor for MongoDB"""
 
@@ -42,43 +82,158 @@ class FHIRIngestor:
         'DiagnosticReport': 'diagnostic_reports'
     }
 
-    def __init__(self, mongo_uri: str = None, db_name: str = None):
+    # Denormalized date fields worth indexing, per resource type
+    DATE_INDEXES = {
+        'Observation': ['effectiveDateTime', 'issued'],
+        'Condition': ['onsetDateTime', 'recordedDate'],
+        'MedicationRequest': ['authoredOn'],
+        'AllergyIntolerance': ['onsetDateTime', 'recordedDate'],
+        'DiagnosticReport': ['effectiveDateTime', 'issued']
+    }
+
+    # Membership test for the per-resource validation hot path
+    _SUPPORTED_SET = frozenset(SUPPORTED_RESOURCES)
+
+    # Top-level resource fields copied onto every stored document
+    DENORMALIZED_FIELDS = [
+        'status', 'code', 'category', 'effectiveDateTime', 'issued',
+        'occurrenceDateTime', 'onsetDateTime', 'authoredOn', 'recordedDate'
+    ]
+
+    def __init__(self, mongo_uri: str = None, db_name: str = None, append_only: bool = False,
+                 fast_load: bool = False, sharded: bool = False):
         """
         Initialize the FHIR ingestor
 
         Args:
             mongo_uri: MongoDB connection string
             db_name: Database name
+            append_only: Insert documents without upserting; existing ids are dead-lettered
+            fast_load: Send bulk writes unacknowledged (w=0) and verify counts afterwards
+            sharded: Collections are sharded on hashed patientId; upsert filters include it
         """
         self.mongo_uri = mongo_uri or os.getenv('MONGODB_URI', 'mongodb://localhost:27017/')
         self.db_name = db_name or os.getenv('DB_NAME', 'fhir_db')
+        self.append_only = append_only
+        self.fast_load = fast_load
+        self.sharded = sharded
         self.client = None
+        self._mongos = None
         self.db = None
+        self.write_db = None
+        self.sent_counts = defaultdict(int)
+        self._dead_buf = []
+        self._collections = {}
+        self._dead = None
+        self._async_collections = {}
+        self._async_dead = None
+        self.counts_before = {}
+        self.async_client = None
+        self.async_db = None
         self.stats = {
             'processed': 0,
             'inserted': 0,
             'updated': 0,
             'errors': 0,
-            'dead_letter': 0
+            'dead_letter': 0,
+            'unacknowledged': 0
         }
+        self._extractors = {
+            resource_type: self._compile_extractor(resource_type)
+            for resource_type in self.SUPPORTED_RESOURCES
+        }
+
+    def _compile_extractor(self, resource_type: str) -> Callable[[Dict[str, Any], str], Dict[str, Any]]:
+        """
+        Compile a function that builds the denormalized document for a resource type
+
+        Field copies are unrolled into straight-line code, and fields that are
+        missing or None are left out so they cost no space in BSON.
+        """
+        fields = ''.join(
+            f"    v = r.get({field!r})\n"
+            f"    if v is not None:\n"
+            f"        doc[{field!r}] = v\n"
+            for field in self.DENORMALIZED_FIELDS
+        )
+        src = (
+            "def extract(r, pid):\n"
+            "    doc = {\n"
+            f"        'resourceType': {resource_type!r},\n"
+            "        'id': r['id'],\n"
+            "        'patientId': pid,\n"
+            "        'resource': r,\n"
+            "    }\n"
+            "    meta = r.get('meta')\n"
+            "    if meta:\n"
+            "        meta_doc = {k: meta[k] for k in ('versionId', 'lastUpdated') if meta.get(k) is not None}\n"
+            "        if meta_doc:\n"
+            "            doc['meta'] = meta_doc\n"
+            f"{fields}"
+            "    return doc\n"
+        )
+        namespace = {}
+        exec(compile(src, f'<extractor:{resource_type}>', 'exec'), namespace)
+        return namespace['extract']
 
     def connect(self):
         """Connect to MongoDB"""
         try:
             logger.info(f"Connecting to MongoDB: {self._mask_uri(self.mongo_uri)}")
-            self.client = MongoClient(
-                self.mongo_uri,
-                serverSelectionTimeoutMS=10000,
-                retryWrites=True
-            )
+            self.client = MongoClient(self.mongo_uri, **self._client_options())
             # Test connection
             self.client.admin.command('ping')
             self.db = self.client[self.db_name]
+            self.write_db = self.db
             logger.info(f"Connected to database: {self.db_name}")
+
+            if self.fast_load:
+                # Same pool, but resource writes are fire-and-forget
+                self.write_db = self.client.get_database(self.db_name, write_concern=WriteConcern(w=0))
+                self.counts_before = self._count_resources()
+                logger.warning("Fast load enabled: resource writes are unacknowledged (w=0)")
+
+            self._bind_collections()
         except Exception as e:
             logger.error(f"Failed to connect to MongoDB: {e}")
             raise
 
+    def _bind_collections(self):
+        """Resolve collection handles once instead of per write"""
+        self._collections = {
+            collection_name: self.write_db[collection_name]
+            for collection_name in self.SUPPORTED_RESOURCES.values()
+        }
+        self._dead = self.db['dead_fhir']
+
+    def connect_async(self):
+        """
+        Create the async MongoDB client used by the HTTP server
+
+        Must be called from within the running event loop.
+        """
+        logger.info(f"Connecting async client to MongoDB: {self._mask_uri(self.mongo_uri)}")
+        self.async_client = AsyncMongoClient(self.mongo_uri, **self._client_options())
+        self.async_db = self.async_client[self.db_name]
+        self._async_collections = {
+            collection_name: self.async_db[collection_name]
+            for collection_name in self.SUPPORTED_RESOURCES.values()
+        }
+        self._async_dead = self.async_db['dead_fhir']
+
+    def _client_options(self) -> Dict[str, Any]:
+        """Options shared by the sync and async MongoDB clients"""
+        return {
+            'serverSelectionTimeoutMS': 10000,
+            'socketTimeoutMS': 60000,
+            'retryWrites': True,
+            # Enough warm sockets for concurrent per-collection bulk writes
+            'maxPoolSize': int(os.getenv('MONGO_MAX_POOL_SIZE', '200')),
+            'minPoolSize': int(os.getenv('MONGO_MIN_POOL_SIZE', '0')),
+            # Full FHIR resources compress well; zlib is the fallback when no zstd backend is installed
+            'compressors': 'zstd,zlib',
+        }
+
     def _mask_uri(self, uri: str) -> str:
         """Mask sensitive information in URI for logging"""
         if '@' in uri:
@@ -90,32 +245,145 @@ class FHIRIngestor:
 
     def setup_indexes(self):
         """Create necessary indexes for all collections"""
-        logger.info("Setting up indexes...")
+        self.setup_minimal_indexes()
+        self.setup_secondary_indexes()
+
+    def create_collections(self):
+        """Pre-create resource collections with zstd block compression"""
+        for collection_name in list(self.SUPPORTED_RESOURCES.values()) + ['dead_fhir']:
+            try:
+                self.db.create_collection(collection_name, storageEngine=ZSTD_STORAGE_ENGINE)
+                logger.info(f"Created collection {collection_name} with zstd compression")
+            except CollectionInvalid:
+                pass  # Already exists; its storage options are left untouched
+
+    def setup_minimal_indexes(self):
+        """Create only the unique (resourceType, id) index the upserts rely on"""
+        self.create_collections()
+
+        logger.info("Setting up upsert indexes...")
 
         for resource_type, collection_name in self.SUPPORTED_RESOURCES.items():
             collection = self.db[collection_name]
+            if not self.sharded and self._is_sharded(collection_name):
+                raise RuntimeError(
+                    f"{self.db_name}.{collection_name} is sharded on patientId; pass --shard, "
+                    f"or drop the collection to load it unsharded"
+                )
+            self._check_upsert_index(collection)
+
+            # Unique compound index for upsert. A unique index must be prefixed by the
+            # shard key, which a hashed patientId key cannot satisfy, so sharded
+            # collections get a plain index instead
+            collection.create_index([('resourceType', 1), ('id', 1)], unique=not self.sharded)
 
-            # Unique compound index for upsert
-            collection.create_index([('resourceType', 1), ('id', 1)], unique=True)
+        logger.info("Upsert indexes created successfully")
+
+    def setup_secondary_indexes(self):
+        """Create patientId, date and dead letter indexes"""
+        logger.info("Setting up secondary indexes...")
+
+        for resource_type, collection_name in self.SUPPORTED_RESOURCES.items():
+            collection = self.db[collection_name]
 
             # Patient ID index for linking
             collection.create_index('patientId')
 
-            # Date indexes where applicable
-            date_fields = ['effectiveDateTime', 'issued', 'occurrenceDateTime',
-                          'onsetDateTime', 'authoredOn', 'recordedDate']
-            for field in date_fields:
-                try:
-                    collection.create_index(field)
-                except:
-                    pass  # Field might not exist for this resource type
+            # Date indexes for the fields this resource type actually carries
+            for field in self.DATE_INDEXES.get(resource_type, []):
+                collection.create_index(field)
 
         # Dead letter collection
         dead_collection = self.db['dead_fhir']
         dead_collection.create_index([('resourceType', 1), ('id', 1)])
         dead_collection.create_index('reason')
 
-        logger.info("Indexes created successfully")
+        logger.info("Secondary indexes created successfully")
+
+    def setup_sharding(self, num_initial_chunks: int = 64):
+        """
+        Shard resource collections on hashed patientId and pre-split them
+
+        An empty collection is a single chunk on a single shard, so without a
+        pre-split the whole load lands on one shard. Must run before the
+        indexes are created.
+
+        Args:
+            num_initial_chunks: Chunks to pre-split each empty collection into
+        """
+        logger.info(f"Sharding collections on hashed patientId ({num_initial_chunks} initial chunks)...")
+        self.create_collections()
+        self.client.admin.command('enableSharding', self.db_name)
+
+        for resource_type, collection_name in self.SUPPORTED_RESOURCES.items():
+            namespace = f'{self.db_name}.{collection_name}'
+            if self._is_sharded(collection_name):
+                logger.info(f"{namespace} is already sharded")
+                continue
+
+            # An unsharded load left a unique upsert index, which shardCollection rejects
+            self._check_upsert_index(self.db[collection_name])
+            self.client.admin.command(
+                'shardCollection', namespace,
+                key={'patientId': 'hashed'},
+                numInitialChunks=num_initial_chunks
+            )
+            logger.info(f"Sharded {namespace}")
+
+    def _is_sharded(self, collection_name: str) -> bool:
+        """
+        Whether the cluster's config.collections records the collection as sharded
+
+        Only a mongos has sharded collections, and users whose role covers just
+        the target database cannot read config; both count as unsharded.
+        """
+        if self._mongos is None:
+            self._mongos = self.client.admin.command('hello').get('msg') == 'isdbgrid'
+        if not self._mongos:
+            return False
+        try:
+            entry = self.client['config']['collections'].find_one(
+                {'_id': f'{self.db_name}.{collection_name}'}, {'dropped': 1}
+            )
+        except OperationFailure as e:
+            logger.warning(f"Cannot read config.collections, assuming {collection_name} is unsharded: {e}")
+            return False
+        return entry is not None and not entry.get('dropped', False)
+
+    def _check_upsert_index(self, collection):
+        """
+        Fail if the upsert index was built for the other sharding mode
+
+        The index is unique on unsharded collections and non-unique on sharded
+        ones. An existing index cannot be changed in place, so switching modes
+        means dropping it first.
+        """
+        index = collection.index_information().get(UPSERT_INDEX_NAME)
+        if index is None or bool(index.get('unique')) != self.sharded:
+            return
+        built_for = 'an unsharded' if self.sharded else 'a sharded'
+        raise RuntimeError(
+            f"{collection.full_name} has the {UPSERT_INDEX_NAME} index from {built_for} load; "
+            f"drop it with db.{collection.name}.dropIndex('{UPSERT_INDEX_NAME}') "
+            f"so it can be rebuilt {'with' if self.sharded else 'without'} --shard"
+        )
+
+    def drop_secondary_indexes(self):
+        """
+        Drop the patientId and date indexes that setup_secondary_indexes creates
+
+        Used before a bulk load so inserts only maintain the indexes the
+        upserts need; setup_secondary_indexes rebuilds them afterwards. Any
+        other index on the collections is left alone.
+        """
+        logger.info("Dropping secondary indexes for bulk load...")
+
+        for resource_type, collection_name in self.SUPPORTED_RESOURCES.items():
+            collection = self.db[collection_name]
+            rebuilt = {'patientId_1'} | {f'{field}_1' for field in self.DATE_INDEXES.get(resource_type, [])}
+            for index_name in collection.index_information():
+                if index_name in rebuilt:
+                    collection.drop_index(index_name)
 
     def derive_patient_id(self, resource: Dict[str, Any]) -> Optional[str]:
         """
@@ -126,18 +394,20 @@ class FHIRIngestor:
         """
         resource_type = resource.get('resourceType')
 
+        # A Patient is linked to itself
+        if resource_type == 'Patient':
+            return resource.get('id')
+
         # Priority order for finding patient reference
-        reference_paths = [
-            'subject.reference',
-            'patient.reference',
-            'encounter.subject.reference' if resource_type == 'Encounter' else None
-        ]
+        if resource_type == 'Encounter':
+            reference_paths = ENCOUNTER_PATIENT_REF_PATHS
+        else:
+            reference_paths = PATIENT_REF_PATHS
 
         for path in reference_paths:
-            if path:
-                ref = self._get_nested_value(resource, path)
-                if ref and ref.startswith('Patient/'):
-                    return ref.split('/', 1)[1]
+            ref = self._get_path(resource, path)
+            if isinstance(ref, str) and len(ref) > PATIENT_PLEN and ref[:PATIENT_PLEN] == PATIENT_PREFIX:
+                return ref[PATIENT_PLEN:]
 
         # Check contained resources for Patient
         contained = resource.get('contained', [])
@@ -149,16 +419,15 @@ class FHIRIngestor:
 
         return None
 
-    def _get_nested_value(self, obj: Dict, path: str) -> Any:
-        """Get nested value from dict using dot notation"""
-        keys = path.split('.')
-        current = obj
-        for key in keys:
-            if isinstance(current, dict) and key in current:
-                current = current[key]
-            else:
-                return None
-        return current
+    @staticmethod
+    def _get_path(obj: Dict, keys: Tuple[str, ...]) -> Any:
+        """Get nested value from dict using a precomputed key path"""
+        try:
+            for key in keys:
+                obj = obj.get(key)
+        except AttributeError:
+            return None
+        return obj
 
     def validate_resource(self, resource: Dict[str, Any]) -> Tuple[bool, List[str]]:
         """
@@ -167,21 +436,31 @@ class FHIRIngestor:
         Returns:
             (is_valid, error_messages)
         """
+        is_valid, errors, _ = self._validate_and_derive(resource)
+        return is_valid, errors
+
+    def _validate_and_derive(self, resource: Dict[str, Any]) -> Tuple[bool, List[str], Optional[str]]:
+        """
+        Validate basic FHIR constraints and derive patientId in a single pass
+
+        Returns:
+            (is_valid, error_messages, patient_id)
+        """
         errors = []
         resource_type = resource.get('resourceType')
         resource_id = resource.get('id')
 
         if not resource_type:
             errors.append("Missing resourceType")
-            return False, errors
+            return False, errors, None
 
         if not resource_id:
             errors.append("Missing id")
-            return False, errors
+            return False, errors, None
 
-        if resource_type not in self.SUPPORTED_RESOURCES:
+        if resource_type not in self._SUPPORTED_SET:
             errors.append(f"Unsupported resourceType: {resource_type}")
-            return False, errors
+            return False, errors, None
 
         # Resource-specific validation
         if resource_type == 'Patient':
@@ -210,76 +489,82 @@ class FHIRIngestor:
         if not patient_id:
             errors.append("Cannot derive patientId from resource")
 
-        return len(errors) == 0, errors
+        return len(errors) == 0, errors, patient_id
 
-    def process_resource(self, resource: Dict[str, Any]) -> bool:
+    def _build_doc(self, resource: Dict[str, Any],
+                   dead_letters: List[Dict[str, Any]]) -> Optional[Tuple[str, Dict[str, Any], Dict[str, Any]]]:
         """
-        Process a single FHIR resource
+        Validate and denormalize a resource without touching the database
+
+        Failed resources are appended to dead_letters for a later bulk insert.
+        A malformed resource that cannot be denormalized is dead-lettered too,
+        so it never takes the rest of its batch down with it.
 
         Returns:
-            True if successfully processed, False otherwise
+            (collection_name, filter, doc) or None if the resource was rejected
         """
         self.stats['processed'] += 1
 
-        # Validate resource
-        is_valid, errors = self.validate_resource(resource)
-        if not is_valid:
-            logger.warning(f"Validation failed for {resource.get('resourceType')}/{resource.get('id')}: {errors}")
-            self._store_dead_letter(resource, 'validation_error', errors)
+        try:
+            return self._denormalize(resource, dead_letters)
+        except Exception as e:
+            logger.warning(f"Failed to process resource: {e}")
+            dead_letters.append(self._dead_letter_doc(resource, 'processing_error', [str(e)]))
             self.stats['errors'] += 1
-            return False
+            return None
 
-        # Derive patient ID
-        patient_id = self.derive_patient_id(resource)
-        if not patient_id:
-            logger.warning(f"Cannot derive patientId for {resource.get('resourceType')}/{resource.get('id')}")
-            self._store_dead_letter(resource, 'no_patient_reference')
+    def _denormalize(self, resource: Dict[str, Any],
+                     dead_letters: List[Dict[str, Any]]) -> Optional[Tuple[str, Dict[str, Any], Dict[str, Any]]]:
+        """Validate and denormalize a resource for _build_doc"""
+        # Validate resource and derive patient ID
+        is_valid, errors, patient_id = self._validate_and_derive(resource)
+        if not is_valid:
+            logger.warning(f"Validation failed for {resource.get('resourceType')}/{resource.get('id')}: {errors}")
+            dead_letters.append(self._dead_letter_doc(resource, 'validation_error', errors))
             self.stats['errors'] += 1
-            return False
+            return None
 
         # Prepare document for storage
         resource_type = resource['resourceType']
         collection_name = self.SUPPORTED_RESOURCES[resource_type]
 
         # Create denormalized document
-        doc = {
-            'resourceType': resource_type,
-            'id': resource['id'],
-            'patientId': patient_id,
-            'resource': resource,  # Store full resource
-        }
-
-        # Extract common top-level fields
-        meta = resource.get('meta', {})
-        doc.update({
-            'meta.versionId': meta.get('versionId'),
-            'meta.lastUpdated': meta.get('lastUpdated'),
-            'status': resource.get('status'),
-            'code': resource.get('code'),
-            'category': resource.get('category'),
-            'effectiveDateTime': resource.get('effectiveDateTime'),
-            'issued': resource.get('issued'),
-            'occurrenceDateTime': resource.get('occurrenceDateTime'),
-            'onsetDateTime': resource.get('onsetDateTime'),
-            'authoredOn': resource.get('authoredOn'),
-            'recordedDate': resource.get('recordedDate'),
-        })
+        doc = self._extractors[resource_type](resource, patient_id)
 
         # Extract encounter reference if present
-        encounter_ref = resource.get('encounter', {}).get('reference')
-        if encounter_ref and encounter_ref.startswith('Encounter/'):
-            doc['encounterId'] = encounter_ref.split('/', 1)[1]
+        encounter_ref = self._get_path(resource, ('encounter', 'reference'))
+        if (isinstance(encounter_ref, str) and len(encounter_ref) > ENCOUNTER_PLEN
+                and encounter_ref[:ENCOUNTER_PLEN] == ENCOUNTER_PREFIX):
+            doc['encounterId'] = encounter_ref[ENCOUNTER_PLEN:]
+
+        filter_doc = {'resourceType': resource_type, 'id': resource['id']}
+        if self.sharded:
+            # Upserts on a sharded collection must target the full shard key
+            filter_doc['patientId'] = patient_id
+
+        return collection_name, filter_doc, doc
+
+    def process_resource(self, resource: Dict[str, Any]) -> bool:
+        """
+        Process a single FHIR resource
+
+        Returns:
+            True if successfully processed, False otherwise
+        """
+        built = self._build_doc(resource, self._dead_buf)
+        if built is None:
+            self._flush_dead(force=False)
+            return False
+
+        collection_name, filter_doc, doc = built
 
         # Upsert document
         try:
-            collection = self.db[collection_name]
-            result = collection.update_one(
-                {'resourceType': resource_type, 'id': resource['id']},
-                {'$set': doc},
-                upsert=True
-            )
+            result = self._collections[collection_name].replace_one(filter_doc, doc, upsert=True)
 
-            if result.upserted_id:
+            if not result.acknowledged:
+                self.stats['unacknowledged'] += 1
+            elif result.upserted_id:
                 self.stats['inserted'] += 1
             else:
                 self.stats['updated'] += 1
@@ -287,56 +572,320 @@ class FHIRIngestor:
             return True
 
         except Exception as e:
-            logger.error(f"Failed to store {resource_type}/{resource['id']}: {e}")
+            logger.error(f"Failed to store {doc['resourceType']}/{doc['id']}: {e}")
             self._store_dead_letter(resource, 'storage_error', [str(e)])
             self.stats['errors'] += 1
             return False
 
-    def _store_dead_letter(self, resource: Dict[str, Any], reason: str, details: List[str] = None):
-        """Store failed resource in dead letter collection"""
-        doc = {
-            'resourceType': resource.get('resourceType'),
-            'id': resource.get('id'),
+    def _dead_letter_doc(self, resource: Dict[str, Any], reason: str, details: List[str] = None) -> Dict[str, Any]:
+        """Build a dead letter document for a failed resource"""
+        # Anything that is not a JSON object is still kept as-is
+        is_object = isinstance(resource, dict)
+        return {
+            'resourceType': resource.get('resourceType') if is_object else None,
+            'id': resource.get('id') if is_object else None,
             'reason': reason,
             'details': details or [],
             'timestamp': datetime.utcnow(),
             'resource': resource
         }
 
+    def _store_dead_letter(self, resource: Dict[str, Any], reason: str, details: List[str] = None):
+        """Buffer failed resource for the dead letter collection"""
+        self._dead_buf.append(self._dead_letter_doc(resource, reason, details))
+        self._flush_dead(force=False)
+
+    def _flush_dead(self, force: bool = True):
+        """
+        Write buffered dead letters with one insert_many
+
+        Args:
+            force: Flush regardless of size; otherwise only once DEAD_LETTER_BUFFER_SIZE is reached
+        """
+        if force or len(self._dead_buf) >= DEAD_LETTER_BUFFER_SIZE:
+            self._store_dead_letters(self._dead_buf)
+
+    def _store_dead_letters(self, dead_letters: List[Dict[str, Any]]):
+        """Store failed resources in the dead letter collection with one bulk insert"""
+        if not dead_letters:
+            return
+
         try:
-            self.db['dead_fhir'].insert_one(doc)
-            self.stats['dead_letter'] += 1
+            result = self._dead.insert_many(dead_letters, ordered=False)
+            self.stats['dead_letter'] += len(result.inserted_ids)
+        except BulkWriteError as e:
+            self._record_dead_letter_errors(e)
         except Exception as e:
-            logger.error(f"Failed to store dead letter: {e}")
+            logger.error(f"Failed to store dead letters: {e}")
+        finally:
+            dead_letters.clear()
+
+    async def _store_dead_letters_async(self, dead_letters: List[Dict[str, Any]]):
+        """Async counterpart of _store_dead_letters using the async client"""
+        if not dead_letters:
+            return
+
+        try:
+            result = await self._async_dead.insert_many(dead_letters, ordered=False)
+            self.stats['dead_letter'] += len(result.inserted_ids)
+        except BulkWriteError as e:
+            self._record_dead_letter_errors(e)
+        except Exception as e:
+            logger.error(f"Failed to store dead letters: {e}")
+        finally:
+            dead_letters.clear()
+
+    def _record_dead_letter_errors(self, e: BulkWriteError):
+        """Account for a partially failed dead letter insert"""
+        self.stats['dead_letter'] += e.details.get('nInserted', 0)
+        logger.error(f"Failed to store {len(e.details.get('writeErrors', []))} dead letters")
+
+    def _flush_writes(self, collection_name: str, ops: List[Union[ReplaceOne, InsertOne]],
+                      resources: List[Dict[str, Any]], dead_letters: List[Dict[str, Any]]):
+        """
+        Flush pending writes for one collection with a single unordered bulk_write
+
+        Args:
+            collection_name: Target collection
+            ops: Pending ReplaceOne or InsertOne operations
+            resources: Source resources, parallel to ops
+            dead_letters: Dead letter buffer for failed writes
+        """
+        if not ops:
+            return
+
+        try:
+            result = self._collections[collection_name].bulk_write(ops, ordered=False)
+            self._record_write_result(collection_name, result, len(ops))
+        except BulkWriteError as e:
+            self._record_write_errors(e, resources, dead_letters)
+        except Exception as e:
+            self._record_failed_batch(collection_name, e, resources, dead_letters)
+        finally:
+            ops.clear()
+            resources.clear()
+
+    async def _flush_writes_async(self, collection_name: str, ops: List[Union[ReplaceOne, InsertOne]],
+                                  resources: List[Dict[str, Any]], dead_letters: List[Dict[str, Any]]):
+        """Async counterpart of _flush_writes using the async client"""
+        if not ops:
+            return
+
+        try:
+            result = await self._async_collections[collection_name].bulk_write(ops, ordered=False)
+            self._record_write_result(collection_name, result, len(ops))
+        except BulkWriteError as e:
+            self._record_write_errors(e, resources, dead_letters)
+        except Exception as e:
+            self._record_failed_batch(collection_name, e, resources, dead_letters)
+        finally:
+            ops.clear()
+            resources.clear()
+
+    def _record_write_result(self, collection_name: str, result: BulkWriteResult, num_ops: int):
+        """Account for a successful bulk write"""
+        self.sent_counts[collection_name] += num_ops
+        if not result.acknowledged:
+            # w=0 writes report no counts; verify_fast_load checks them afterwards
+            self.stats['unacknowledged'] += num_ops
+            return
+
+        self.stats['inserted'] += result.inserted_count + result.upserted_count
+        self.stats['updated'] += result.matched_count
+
+    def _record_write_errors(self, e: BulkWriteError, resources: List[Dict[str, Any]],
+                             dead_letters: List[Dict[str, Any]]):
+        """Account for a partially failed bulk write and dead-letter the failed resources"""
+        # Unordered writes keep going past failures; account for what landed
+        self.stats['inserted'] += e.details.get('nInserted', 0) + e.details.get('nUpserted', 0)
+        self.stats['updated'] += e.details.get('nMatched', 0)
+        for error in e.details.get('writeErrors', []):
+            resource = resources[error['index']]
+            reason = 'duplicate_id' if error.get('code') == DUPLICATE_KEY_ERROR else 'storage_error'
+            logger.error(f"Failed to store {resource['resourceType']}/{resource['id']}: {error.get('errmsg')}")
+            dead_letters.append(self._dead_letter_doc(resource, reason, [error.get('errmsg', '')]))
+            self.stats['errors'] += 1
+
+    def _record_failed_batch(self, collection_name: str, e: Exception, resources: List[Dict[str, Any]],
+                             dead_letters: List[Dict[str, Any]]):
+        """Dead-letter every resource of a bulk write that failed outright"""
+        logger.error(f"Failed to store batch for {collection_name}: {e}")
+        for resource in resources:
+            dead_letters.append(self._dead_letter_doc(resource, 'storage_error', [str(e)]))
+        self.stats['errors'] += len(resources)
+
+    def _write_op(self, filter_doc: Dict[str, Any], doc: Dict[str, Any]) -> Union[ReplaceOne, InsertOne]:
+        """Build the bulk write operation for a document"""
+        if self.append_only:
+            return InsertOne(doc)
+        return ReplaceOne(filter_doc, doc, upsert=True)
 
     def process_batch(self, resources: List[Dict[str, Any]], batch_size: int = 500) -> Dict[str, int]:
         """
         Process a batch of resources efficiently
 
+        Writes are grouped per collection and flushed with unordered
+        bulk_write calls of up to batch_size operations. Documents are
+        upserted, or plainly inserted when append_only is set.
+
         Args:
             resources: List of FHIR resources
-            batch_size: Number of resources per batch
+            batch_size: Number of operations per bulk write
+
+        Returns:
+            Processing statistics
+        """
+        logger.info(f"Processing {len(resources)} resources in batches of {batch_size}")
+
+        dead_letters = []
+        built_docs = (self._build_doc(resource, dead_letters) for resource in resources)
+        self._write_docs(built_docs, dead_letters, batch_size)
+        self._flush_dead()
+
+        return self.stats.copy()
+
+    def _write_docs(self, built_docs: Iterable[Optional[Tuple[str, Dict[str, Any], Dict[str, Any]]]],
+                    dead_letters: List[Dict[str, Any]], batch_size: int = 500):
+        """
+        Write built documents to their collections in bulk
+
+        Args:
+            built_docs: (collection_name, filter, doc) tuples from _build_doc; None entries are skipped
+            dead_letters: Dead letter buffer, flushed along with the writes
+            batch_size: Number of operations per bulk write
+        """
+        pending_ops = defaultdict(list)
+        pending_resources = defaultdict(list)
+
+        for built in built_docs:
+            if built is None:
+                continue
+
+            collection_name, filter_doc, doc = built
+            ops = pending_ops[collection_name]
+            ops.append(self._write_op(filter_doc, doc))
+            pending_resources[collection_name].append(doc['resource'])
+
+            if len(ops) >= batch_size:
+                self._flush_writes(collection_name, ops, pending_resources[collection_name], dead_letters)
+
+            if len(dead_letters) >= batch_size:
+                self._store_dead_letters(dead_letters)
+
+        for collection_name, ops in pending_ops.items():
+            self._flush_writes(collection_name, ops, pending_resources[collection_name], dead_letters)
+        self._store_dead_letters(dead_letters)
+
+    async def process_batch_async(self, resources: List[Dict[str, Any]], batch_size: int = 500) -> Dict[str, int]:
+        """
+        Process a batch of resources with the async client
+
+        Same semantics as process_batch; bulk writes are awaited so the
+        event loop can serve other requests while MongoDB round-trips run.
+
+        Args:
+            resources: List of FHIR resources
+            batch_size: Number of operations per bulk write
 
         Returns:
             Processing statistics
         """
         logger.info(f"Processing {len(resources)} resources in batches of {batch_size}")
 
-        for i in range(0, len(resources), batch_size):
-            batch = resources[i:i + batch_size]
-            logger.info(f"Processing batch {i//batch_size + 1}/{(len(resources) + batch_size - 1)//batch_size}")
+        pending_ops = defaultdict(list)
+        pending_resources = defaultdict(list)
+        dead_letters = []
+
+        for resource in resources:
+            built = self._build_doc(resource, dead_letters)
+            if built is None:
+                continue
+
+            collection_name, filter_doc, doc = built
+            ops = pending_ops[collection_name]
+            ops.append(self._write_op(filter_doc, doc))
+            pending_resources[collection_name].append(resource)
 
-            for resource in batch:
-                self.process_resource(resource)
+            if len(ops) >= batch_size:
+                await self._flush_writes_async(collection_name, ops, pending_resources[collection_name], dead_letters)
+
+            if len(dead_letters) >= batch_size:
+                await self._store_dead_letters_async(dead_letters)
+
+        for collection_name, ops in pending_ops.items():
+            await self._flush_writes_async(collection_name, ops, pending_resources[collection_name], dead_letters)
+        await self._store_dead_letters_async(dead_letters)
 
         return self.stats.copy()
 
-    def process_directory(self, input_dir: str):
+    def process_stream(self, resources: Iterable[Dict[str, Any]], batch_size: int = 500) -> Dict[str, int]:
+        """
+        Process resources from an iterable without materializing it
+
+        Args:
+            resources: Iterable of FHIR resources
+            batch_size: Number of resources per batch
+
+        Returns:
+            Processing statistics
+        """
+        iterator = iter(resources)
+        while True:
+            batch = list(islice(iterator, batch_size))
+            if not batch:
+                break
+            self.process_batch(batch, batch_size)
+
+        return self.stats.copy()
+
+    def _iter_file_resources(self, json_file: Path) -> Iterator[Dict[str, Any]]:
+        """
+        Yield FHIR resources from a JSON file
+
+        Supports a single resource, an array of resources or a Bundle. Files
+        above STREAM_THRESHOLD_BYTES are parsed incrementally with ijson.
+        """
+        if json_file.stat().st_size < STREAM_THRESHOLD_BYTES:
+            with open(json_file, 'rb') as f:
+                data = orjson.loads(f.read())
+
+            if isinstance(data, list):
+                yield from data
+            elif data.get('resourceType') == 'Bundle':
+                for entry in data.get('entry', []):
+                    if entry.get('resource'):
+                        yield entry['resource']
+            else:
+                yield data
+            return
+
+        with open(json_file, 'rb') as f:
+            # Sniff the root to pick the streaming prefix
+            is_array = False
+            is_bundle = False
+            for prefix, event, value in ijson.parse(f):
+                if prefix == '' and event == 'start_array':
+                    is_array = True
+                    break
+                if prefix == 'resourceType' and event == 'string':
+                    is_bundle = value == 'Bundle'
+                    break
+            f.seek(0)
+
+            if is_array:
+                yield from ijson.items(f, 'item', use_float=True)
+            elif is_bundle:
+                yield from ijson.items(f, 'entry.item.resource', use_float=True)
+            else:
+                yield from ijson.items(f, '', use_float=True)
+
+    def process_directory(self, input_dir: str, workers: int = 1):
         """
         Process all JSON files in a directory
 
         Args:
             input_dir: Path to directory containing JSON files
+            workers: Number of parser processes; 1 parses in-process, 0 uses one per CPU core minus one
         """
         input_path = Path(input_dir)
         if not input_path.exists():
@@ -345,29 +894,128 @@ class FHIRIngestor:
         json_files = list(input_path.glob('*.json'))
         logger.info(f"Found {len(json_files)} JSON files in {input_dir}")
 
-        total_resources = 0
-        for json_file in json_files:
-            logger.info(f"Processing {json_file.name}")
-            try:
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-
-                # Handle both single resource and array of resources
-                if isinstance(data, list):
-                    resources = data
-                else:
-                    resources = [data]
+        if workers == 0:
+            workers = max(1, (os.cpu_count() or 1) - 1)
 
-                self.process_batch(resources)
-                total_resources += len(resources)
+        processed_before = self.stats['processed']
+        if workers > 1 and len(json_files) > 1:
+            self._process_files_parallel(json_files, workers)
+        else:
+            for json_file in json_files:
+                logger.info(f"Processing {json_file.name}")
+                try:
+                    self.process_stream(self._iter_file_resources(json_file))
 
-            except json.JSONDecodeError as e:
-                logger.error(f"Invalid JSON in {json_file}: {e}")
-            except Exception as e:
-                logger.error(f"Error processing {json_file}: {e}")
+                except (json.JSONDecodeError, ijson.JSONError) as e:
+                    logger.error(f"Invalid JSON in {json_file}: {e}")
+                except Exception as e:
+                    logger.error(f"Error processing {json_file}: {e}")
 
+        total_resources = self.stats['processed'] - processed_before
         logger.info(f"Processed {total_resources} resources from {len(json_files)} files")
 
+    def _process_files_parallel(self, json_files: List[Path], workers: int):
+        """
+        Parse, validate and denormalize files in worker processes
+
+        Workers never touch MongoDB; this process drains their results as
+        they complete and runs the bulk writes on its own client. Each
+        worker returns a whole file's documents, so very large single files
+        are better served by the streaming in-process path.
+        """
+        logger.info(f"Parsing {len(json_files)} files with {workers} worker processes")
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(_parse_file, str(json_file), self.sharded): json_file
+                for json_file in json_files
+            }
+            for future in as_completed(futures):
+                json_file = futures[future]
+                try:
+                    built_docs, dead_letters, worker_stats = future.result()
+                except (json.JSONDecodeError, ijson.JSONError) as e:
+                    logger.error(f"Invalid JSON in {json_file}: {e}")
+                    continue
+                except Exception as e:
+                    logger.error(f"Error processing {json_file}: {e}")
+                    continue
+
+                logger.info(f"Writing {len(built_docs)} resources from {json_file.name}")
+                self.stats['processed'] += worker_stats['processed']
+                self.stats['errors'] += worker_stats['errors']
+                self._write_docs(built_docs, dead_letters)
+
+    def _count_resources(self) -> Dict[str, int]:
+        """
+        Exact document counts for every resource collection
+
+        The counts are independent, so they run concurrently and the total
+        wait is the slowest count rather than the sum of all of them.
+
+        Concurrent counts each see a different point of any w=0 stream still
+        in flight, so one pass is not a consistent snapshot. That is only
+        safe because callers count before the load starts (connect) or
+        through _settled_counts, which repeats passes until they agree.
+        """
+        collection_names = list(self.SUPPORTED_RESOURCES.values())
+        with ThreadPoolExecutor(max_workers=len(collection_names)) as executor:
+            counts = executor.map(lambda name: self.db[name].count_documents({}), collection_names)
+            return dict(zip(collection_names, counts))
+
+    def _settled_counts(self) -> Dict[str, int]:
+        """
+        Collection counts once in-flight unacknowledged writes have landed
+
+        The last w=0 batches can still be queued on other pooled sockets
+        when the load returns, so counts are repeated until two consecutive
+        passes agree or FAST_LOAD_SETTLE_TIMEOUT expires.
+        """
+        deadline = time.monotonic() + FAST_LOAD_SETTLE_TIMEOUT
+        counts = self._count_resources()
+        while time.monotonic() < deadline:
+            time.sleep(FAST_LOAD_SETTLE_INTERVAL)
+            recount = self._count_resources()
+            if recount == counts:
+                return counts
+            counts = recount
+
+        logger.warning(f"Collection counts still changing after {FAST_LOAD_SETTLE_TIMEOUT}s; verifying the latest counts")
+        return counts
+
+    def verify_fast_load(self) -> bool:
+        """
+        Check collection counts after an unacknowledged load
+
+        Unacknowledged writes report no errors, so this is the only signal
+        that writes were dropped. Append-only loads must add exactly the
+        number of documents sent. Upserts can replace existing documents,
+        so for them the count can only be checked against bounds.
+
+        Returns:
+            True if every collection count is consistent with what was sent
+        """
+        if not self.fast_load:
+            return True
+
+        logger.info("Verifying fast load collection counts...")
+        consistent = True
+        counts_after = self._settled_counts()
+        for collection_name, sent in self.sent_counts.items():
+            before = self.counts_before.get(collection_name, 0)
+            after = counts_after[collection_name]
+            if self.append_only:
+                ok = after == before + sent
+            else:
+                ok = before <= after <= before + sent
+            if not ok:
+                consistent = False
+                logger.error(f"{collection_name}: count {after} inconsistent with {before} existing + {sent} sent")
+            else:
+                logger.info(f"{collection_name}: {after} documents ({sent} sent)")
+
+        return consistent
+
     def print_summary(self):
         """Print processing summary and example queries"""
         print("\n" + "="*60)
@@ -378,13 +1026,17 @@ class FHIRIngestor:
         print(f"Updated: {self.stats['updated']}")
         print(f"Errors: {self.stats['errors']}")
         print(f"Dead letter: {self.stats['dead_letter']}")
+        if self.fast_load:
+            print(f"Unacknowledged writes: {self.stats['unacknowledged']}")
 
-        # Collection counts
+        # Collection counts; resource collections can be large, so read the
+        # metadata count instead of scanning
         print("\nCOLLECTION COUNTS:")
         for resource_type, collection_name in self.SUPPORTED_RESOURCES.items():
-            count = self.db[collection_name].count_documents({})
+            count = self.db[collection_name].estimated_document_count()
             print(f"  {collection_name}: {count}")
 
+        # The dead letter set is expected to stay small, so keep this one exact
         dead_count = self.db['dead_fhir'].count_documents({})
         print(f"  dead_fhir: {dead_count}")
 
@@ -402,24 +1054,81 @@ observations = db.observations.find({ patientId: patient.id }).toArray()
     def close(self):
         """Close MongoDB connection"""
         if self.client:
+            self._flush_dead()
             self.client.close()
             logger.info("MongoDB connection closed")
 
+    async def close_async(self):
+        """Close the async MongoDB client"""
+        if self.async_client:
+            await self.async_client.close()
+            self.async_client = None
+            logger.info("Async MongoDB connection closed")
+
+
+# Per-process ingestor used by _parse_file workers; never connected to MongoDB
+_worker_ingestor = None
+
+def _parse_file(path: str, sharded: bool = False) -> Tuple[List[Tuple[str, Dict[str, Any], Dict[str, Any]]], List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Parse and denormalize one JSON file in a worker process
+
+    Returns:
+        (built_docs, dead_letters, stats) for the parent process to write
+    """
+    global _worker_ingestor
+    if _worker_ingestor is None:
+        _worker_ingestor = FHIRIngestor(sharded=sharded)
+
+    _worker_ingestor.stats = dict.fromkeys(_worker_ingestor.stats, 0)
+    dead_letters = []
+    built_docs = []
+    for resource in _worker_ingestor._iter_file_resources(Path(path)):
+        built = _worker_ingestor._build_doc(resource, dead_letters)
+        if built is not None:
+            built_docs.append(built)
+
+    return built_docs, dead_letters, _worker_ingestor.stats
+
 
-# Flask app for HTTP endpoint
-app = Flask(__name__)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the shared async client for the lifetime of the server process"""
+    global ingestor
+    if ingestor is None:
+        # Spawned uvicorn workers import the module fresh and configure from the environment
+        ingestor = FHIRIngestor(append_only=os.getenv('APPEND_ONLY', '').lower() == 'true',
+                                sharded=os.getenv('SHARDED', '').lower() == 'true')
+    ingestor.connect_async()
+    try:
+        yield
+    finally:
+        await ingestor.close_async()
+
+
+# ASGI app for HTTP endpoint
+app = FastAPI(title='FHIR R4 Resource Ingestor', lifespan=lifespan)
 ingestor = None
 
-@app.route('/ingest', methods=['POST'])
-def ingest_resources():
+def _json_response(payload: Dict[str, Any], status_code: int = 200) -> Response:
+    """Serialize a response body with orjson"""
+    return Response(orjson.dumps(payload), media_type='application/json', status_code=status_code)
+
+
+@app.post('/ingest')
+async def ingest_resources(request: Request):
     """HTTP endpoint to ingest FHIR resources"""
     try:
-        data = request.get_json()
+        try:
+            data = orjson.loads(await request.body())
+        except orjson.JSONDecodeError as e:
+            return _json_response({'error': f'Invalid JSON: {e}'}, status_code=400)
+
         if not isinstance(data, list):
-            return jsonify({'error': 'Expected array of FHIR resources'}), 400
+            return _json_response({'error': 'Expected array of FHIR resources'}, status_code=400)
 
-        stats = ingestor.process_batch(data)
-        return jsonify({
+        stats = await ingestor.process_batch_async(data)
+        return _json_response({
             'status': 'success',
             'processed': stats['processed'],
             'inserted': stats['inserted'],
@@ -429,12 +1138,12 @@ def ingest_resources():
 
     except Exception as e:
         logger.error(f"HTTP ingestion error: {e}")
-        return jsonify({'error': str(e)}), 500
+        return _json_response({'error': str(e)}, status_code=500)
 
-@app.route('/health', methods=['GET'])
-def health_check():
+@app.get('/health')
+async def health_check():
     """Health check endpoint"""
-    return jsonify({'status': 'healthy', 'timestamp': datetime.utcnow().isoformat()})
+    return _json_response({'status': 'healthy', 'timestamp': datetime.utcnow().isoformat()})
 
 
 def main():
@@ -445,32 +1154,76 @@ def main():
     parser.add_argument('--input-dir', help='Directory containing JSON files')
     parser.add_argument('--http', action='store_true', help='Run HTTP server mode')
     parser.add_argument('--port', type=int, default=5000, help='HTTP server port')
+    parser.add_argument('--bulk-load', action='store_true',
+                        help='Defer secondary indexes until the file load completes')
+    parser.add_argument('--append-only', action='store_true',
+                        help='Insert without upserting; resources with existing ids go to dead_fhir')
+    parser.add_argument('--fast-load', action='store_true',
+                        help='Send file-mode writes unacknowledged (w=0) and verify counts afterwards')
+    parser.add_argument('--shard', action='store_true',
+                        help='Shard collections on hashed patientId and pre-split them before loading')
+    parser.add_argument('--shard-chunks', type=int, default=64,
+                        help='Initial chunks per collection when sharding')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Parser processes for file mode (0 = one per CPU core minus one), '
+                             'or uvicorn worker processes for HTTP mode')
 
     args = parser.parse_args()
+    bulk_load = args.bulk_load and args.input_dir and not args.http
 
     # Initialize ingestor
     global ingestor
-    ingestor = FHIRIngestor()
+    ingestor = FHIRIngestor(append_only=args.append_only,
+                            fast_load=bool(args.fast_load and args.input_dir and not args.http),
+                            sharded=args.shard)
     ingestor.connect()
-    ingestor.setup_indexes()
+    try:
+        if args.shard:
+            ingestor.setup_sharding(args.shard_chunks)
+        if bulk_load:
+            ingestor.setup_minimal_indexes()
+            ingestor.drop_secondary_indexes()
+        else:
+            ingestor.setup_indexes()
+    except RuntimeError as e:
+        # Collections set up for the other sharding mode
+        logger.error(str(e))
+        ingestor.close()
+        sys.exit(1)
 
+    consistent = True
     try:
         if args.http:
             # HTTP server mode
             logger.info(f"Starting HTTP server on port {args.port}")
-            app.run(host='0.0.0.0', port=args.port, debug=False)
+            if args.workers > 1:
+                # Workers re-import the app, so pass settings through the environment
+                if args.append_only:
+                    os.environ['APPEND_ONLY'] = 'true'
+                if args.shard:
+                    os.environ['SHARDED'] = 'true'
+                uvicorn.run('fhir_ingestor:app', host='0.0.0.0', port=args.port, workers=args.workers)
+            else:
+                uvicorn.run(app, host='0.0.0.0', port=args.port)
 
         elif args.input_dir:
             # File processing mode
-            ingestor.process_directory(args.input_dir)
+            ingestor.process_directory(args.input_dir, workers=args.workers)
+            consistent = ingestor.verify_fast_load()
             ingestor.print_summary()
 
         else:
             parser.print_help()
 
     finally:
+        if bulk_load:
+            ingestor.setup_secondary_indexes()
         ingestor.close()
 
+    if not consistent:
+        logger.error("Fast load verification failed: some unacknowledged writes were not applied")
+        sys.exit(1)
+
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -4,28 +4,21 @@ Simple FHIR Data Inserter
 Inserts FHIR R4 resources into MongoDB with patientId linking
 """
 
-import os
-from pymongo import MongoClient
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
+from fhir_ingestor import FHIRIngestor
 
 def insert_fhir_data():
     """Insert sample FHIR data with patientId linking"""
 
-    # MongoDB connection
-    mongo_uri = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/')
-    client = MongoClient(mongo_uri)
-    db = client['fhir_db']  # Use a simple database name
-
-    print(f"Connected to MongoDB: {mongo_uri.replace(mongo_uri.split('@')[0].split('//')[1] if '@' in mongo_uri else '', '***:***@')}")
+    # MongoDB connection (MONGODB_URI / DB_NAME from the environment)
+    ingestor = FHIRIngestor()
+    ingestor.connect()
+    ingestor.setup_indexes()
+    db = ingestor.db
 
     # Sample FHIR R4 Patient
     patient = {
         "resourceType": "Patient",
         "id": "patient-001",
-        "patientId": "patient-001",  # Self-reference for consistency
         "name": [{
             "family": "Doe",
             "given": ["John"],
@@ -51,7 +44,6 @@ def insert_fhir_data():
     observation = {
         "resourceType": "Observation",
         "id": "obs-001",
-        "patientId": "patient-001",  # Links to patient
         "status": "final",
         "category": [{
             "coding": [{
@@ -83,7 +75,6 @@ def insert_fhir_data():
     condition = {
         "resourceType": "Condition",
         "id": "cond-001",
-        "patientId": "patient-001",  # Links to patient
         "clinicalStatus": {
             "coding": [{
                 "system": "http://terminology.hl7.org/CodeSystem/condition-clinical",
@@ -123,7 +114,6 @@ def insert_fhir_data():
     encounter = {
         "resourceType": "Encounter",
         "id": "enc-001",
-        "patientId": "patient-001",  # Links to patient
         "status": "finished",
         "class": {
             "system": "http://terminology.hl7.org/CodeSystem/v3-ActCode",
@@ -153,30 +143,17 @@ def insert_fhir_data():
         }]
     }
 
-    # Insert data
+    # Insert data through the bulk pipeline; patientId is derived from the references
     try:
-        # Insert patient
-        db.patients.insert_one(patient)
-        print("✅ Inserted patient")
-
-        # Insert observation
-        db.observations.insert_one(observation)
-        print("✅ Inserted observation")
-
-        # Insert condition
-        db.conditions.insert_one(condition)
-        print("✅ Inserted condition")
-
-        # Insert encounter
-        db.encounters.insert_one(encounter)
-        print("✅ Inserted encounter")
-
-        print("\n🎉 All FHIR data inserted successfully!")
+        stats = ingestor.process_batch([patient, observation, condition, encounter])
+        if stats['errors']:
+            print(f"\n⚠️  {stats['errors']} resources were rejected, see the dead_fhir collection")
+        else:
+            print("\n🎉 All FHIR data inserted successfully!")
         print("\n📊 Data Summary:")
-        print(f"   • Patients: {db.patients.count_documents({})}")
-        print(f"   • Observations: {db.observations.count_documents({})}")
-        print(f"   • Conditions: {db.conditions.count_documents({})}")
-        print(f"   • Encounters: {db.encounters.count_documents({})}")
+        print(f"   • Processed: {stats['processed']}")
+        print(f"   • Inserted: {stats['inserted']}")
+        print(f"   • Updated: {stats['updated']}")
 
         print("\n🔗 Query Examples:")
 
@@ -204,7 +181,7 @@ def insert_fhir_data():
         print(f"❌ Error inserting data: {e}")
         raise
     finally:
-        client.close()
+        ingestor.close()
         print("\n🔌 MongoDB connection closed")
 
 if __name__ == "__main__":
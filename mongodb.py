@@ -11,23 +11,126 @@ from typing import List, Dict, Any
 import uuid
 from faker import Faker
 import pymongo
-from pymongo import MongoClient
+from pymongo import MongoClient, WriteConcern, InsertOne, IndexModel
+from pymongo.errors import BulkWriteError, ClientBulkWriteException
+import bson
+from bson import encode
+from bson.raw_bson import RawBSONDocument
 import os
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# Documents buffered per collection before an insert_many; generated
+# resources are ~0.5-1KB each, so even 10-20k documents stay far below the
+# 16MB message limit. main() reads an INSERT_BATCH_SIZE override for remote
+# clusters where fewer, larger round trips pay off
+INSERT_BATCH_SIZE = 1000
+
+# Threads issuing insert_many calls concurrently (one per collection); the
+# connection pool is sized so every insert thread gets its own socket
+INSERT_WORKERS = 5
+MAX_POOL_SIZE = 16
+
+# Batches that may be queued or in flight at once; generation blocks when
+# inserts fall behind instead of piling up batches in memory
+MAX_PENDING_BATCHES = INSERT_WORKERS * 2
+
+# Wire compression for inserts; generated resources repeat the same code
+# systems and displays, so they shrink well. Set MONGO_COMPRESSORS to an
+# empty value to disable it, e.g. against a local server
+COMPRESSORS = os.getenv('MONGO_COMPRESSORS', 'zstd,zlib')
+
+# Patient indexes handed to a generator process at a time
+BUNDLE_CHUNK_SIZE = 64
+
+# Pre-generated Faker values; patients sample from these pools instead of
+# calling Faker each time
+FAKER_POOL_SIZE = 10000
+
+# Generated collections and how they are named in progress output
+COLLECTION_LABELS = {
+    'patients': 'patients',
+    'observations': 'observations',
+    'conditions': 'conditions',
+    'medication_requests': 'medication requests',
+    'encounters': 'encounters'
+}
+
+# How far back generated resource dates reach
+ONE_YEAR = timedelta(days=365)
+FIVE_YEARS = timedelta(days=5 * 365)
+SIX_MONTHS = timedelta(days=180)
+
+# Patients are adults aged 18 to 90, in whole calendar years
+MIN_PATIENT_AGE = 18
+MAX_PATIENT_AGE = 90
+
+# Indexes built once the load is finished, so inserts never maintain them
+GENERATED_INDEXES = {
+    'patients': ['id'],
+    'observations': ['subject.reference', 'effectiveDateTime'],
+    'conditions': ['subject.reference', 'onsetDateTime'],
+    'medication_requests': ['subject.reference', 'authoredOn'],
+    'encounters': ['subject.reference', 'period.start']
+}
+
+# Resource ids are unique within a collection; a unique index enforces it
+# on the server instead of a duplicate scan after the load
+UNIQUE_INDEX_FIELDS = {'id'}
+
+def _years_before(value: datetime, years: int) -> datetime:
+    """Same calendar date the given number of years earlier; Feb 29 maps to Feb 28"""
+    try:
+        return value.replace(year=value.year - years)
+    except ValueError:
+        return value.replace(year=value.year - years, day=28)
+
+
+def _iso_z(value: datetime) -> str:
+    """Format a datetime as a FHIR instant with millisecond precision"""
+    return value.isoformat(timespec='milliseconds') + "Z"
+
+
+def _encode_bundle(bundle: tuple) -> tuple:
+    """
+    Encode every document of a patient bundle to BSON up front
+
+    insert_many sends RawBSONDocument bytes as-is, so encoding happens
+    where the bundle is generated (in parallel when using worker processes)
+    rather than in the insert threads.
+    """
+    return tuple([RawBSONDocument(encode(document)) for document in documents] for documents in bundle)
+
+
 class FHIRDataGenerator:
-    def __init__(self, mongo_uri: str = None, database_name: str = "medical_db"):
+    def __init__(self, mongo_uri: str = None, database_name: str = "medical_db", seed: int = None):
         """
         Initialize the FHIR data generator
 
         Args:
             mongo_uri: MongoDB connection string
             database_name: Name of the database to use
+            seed: Seed for the generator's private random number generator
         """
-        self.fake = Faker(['en_US'])
+        # Private generator rather than the module-level one, so each
+        # worker process owns and seeds its own sequence
+        self.random = random.Random(seed)
+        # All element weights are ignored: sampling is uniform, which skips
+        # Faker's weighted-choice path on every provider call
+        self.fake = Faker(['en_US'], use_weighting=False)
+        # Value pools are built on demand by build_value_pools, sized to the run
+        self.addresses = None
+        self.phone_numbers = None
+        self.first_names = None
+        self.last_names = None
+
+        # Reference point for generated dates; reset at the start of each run
+        self.now = datetime.now()
         self.mongo_uri = mongo_uri or os.getenv('MONGODB_URI', 'mongodb://localhost:27017/')
         self.database_name = database_name
         self.client = None
@@ -110,16 +213,61 @@ class FHIRDataGenerator:
             '849300': 'Levothyroxine 125 MCG Oral Tablet'
         }
 
+        # (code, display) choices built once rather than on every resource
+        self.vital_code_options = tuple(self.loinc_codes['vitals'].items())
+        self.lab_code_options = tuple(self.loinc_codes['labs'].items())
+        self.condition_code_options = tuple(self.snomed_codes['conditions'].items())
+        self.encounter_code_options = tuple(self.snomed_codes['encounters'].items())
+        self.medication_code_options = tuple(self.rxnorm_codes.items())
+        self.condition_codes = tuple(self.snomed_codes['conditions'].keys())
+        self.condition_displays = tuple(self.snomed_codes['conditions'].values())
+
+        # Patient fields that never vary between patients; shared across
+        # documents since they are encoded on insert and never mutated
+        self.marital_status_options = (
+            {"coding": [{"system": "http://hl7.org/fhir/v3/MaritalStatus", "code": "S", "display": "Single"}]},
+            {"coding": [{"system": "http://hl7.org/fhir/v3/MaritalStatus", "code": "M", "display": "Married"}]},
+            {"coding": [{"system": "http://hl7.org/fhir/v3/MaritalStatus", "code": "D", "display": "Divorced"}]},
+            {"coding": [{"system": "http://hl7.org/fhir/v3/MaritalStatus", "code": "W", "display": "Widowed"}]}
+        )
+        self.communication = [{
+            "language": {
+                "coding": [{
+                    "system": "urn:ietf:bcp:47",
+                    "code": "en-US",
+                    "display": "English (United States)"
+                }]
+            },
+            "preferred": True
+        }]
+
+        # Encounter lengths, whole minutes from 15 minutes to 2 hours
+        self.encounter_durations = tuple(timedelta(minutes=minutes) for minutes in range(15, 121))
+
+        # Realistic value generator and unit per observation code
+        self.observation_value_specs = {
+            '8480-6': (lambda: self.random.randint(90, 180), "mmHg"),  # Systolic BP
+            '8462-4': (lambda: self.random.randint(60, 110), "mmHg"),  # Diastolic BP
+            '8867-4': (lambda: self.random.randint(60, 100), "beats/min"),  # Heart rate
+            '39156-5': (lambda: round(self.random.uniform(18.5, 40.0), 1), "kg/m2"),  # BMI
+            '29463-7': (lambda: round(self.random.uniform(45, 150), 1), "kg"),  # Weight
+            '8302-2': (lambda: self.random.randint(150, 200), "cm"),  # Height
+            '2093-3': (lambda: self.random.randint(120, 300), "mg/dL"),  # Total cholesterol
+            '2085-9': (lambda: self.random.randint(30, 80), "mg/dL"),  # HDL
+            '2160-0': (lambda: round(self.random.uniform(0.5, 2.0), 1), "mg/dL")  # Creatinine
+        }
+        self.default_observation_value_spec = (lambda: round(self.random.uniform(10, 200), 1), "mg/dL")
+
     def connect_to_mongodb(self):
         """Connect to MongoDB with fallback options"""
         try:
             print(f"🔌 Attempting to connect to MongoDB...")
             print(f"   URI: {self.mongo_uri.replace(self.mongo_uri.split('@')[0].split('//')[1], '***:***@') if '@' in self.mongo_uri else self.mongo_uri}")
 
-            self.client = MongoClient(self.mongo_uri, serverSelectionTimeoutMS=5000)
+            self.client = MongoClient(self.mongo_uri, serverSelectionTimeoutMS=5000, **self._client_options())
             # Test the connection
             self.client.admin.command('ping')
-            self.db = self.client[self.database_name]
+            self.db = self._load_database()
             print(f"✅ Connected to MongoDB database: {self.database_name}")
         except Exception as e:
             print(f"❌ Failed to connect to MongoDB: {e}")
@@ -128,9 +276,9 @@ class FHIRDataGenerator:
             print("🔄 Attempting fallback to local MongoDB...")
             try:
                 local_uri = "mongodb://localhost:27017/"
-                self.client = MongoClient(local_uri, serverSelectionTimeoutMS=2000)
+                self.client = MongoClient(local_uri, serverSelectionTimeoutMS=2000, **self._client_options())
                 self.client.admin.command('ping')
-                self.db = self.client[self.database_name]
+                self.db = self._load_database()
                 print(f"✅ Connected to local MongoDB database: {self.database_name}")
                 print("⚠️  Using local MongoDB - make sure MongoDB is running locally")
             except Exception as local_e:
@@ -142,6 +290,22 @@ class FHIRDataGenerator:
                 print("   4. Check your MongoDB Atlas cluster is active and accessible")
                 raise Exception("Unable to connect to MongoDB. Please check your connection string or install local MongoDB.")
 
+    def _client_options(self) -> Dict[str, Any]:
+        """Options shared by the primary and fallback MongoDB clients"""
+        options = {'maxPoolSize': MAX_POOL_SIZE}
+        if COMPRESSORS:
+            options['compressors'] = COMPRESSORS
+        return options
+
+    def _load_database(self):
+        """
+        Get the database handle used for the load
+
+        The database is cleared and regenerated on every run, so writes
+        only wait for the primary (w=1) without a journal flush.
+        """
+        return self.client.get_database(self.database_name, write_concern=WriteConcern(w=1, j=False))
+
     def clear_all_data(self):
         """Clear all existing data from the database"""
         try:
@@ -155,55 +319,95 @@ class FHIRDataGenerator:
             print(f"❌ Failed to clear data: {e}")
             raise
 
+    def create_indexes(self):
+        """
+        Create the query indexes on the generated collections
+
+        Called after the bulk load: collections are dropped beforehand, so
+        inserts only maintain _id and each index is built in one pass. All
+        indexes of a collection are sent in a single createIndexes command,
+        which builds them together in one scan.
+        """
+        for collection_name, fields in GENERATED_INDEXES.items():
+            self.db[collection_name].create_indexes([
+                IndexModel(field, unique=field in UNIQUE_INDEX_FIELDS) for field in fields
+            ])
+            print(f"📇 Indexed {COLLECTION_LABELS[collection_name]}: {', '.join(fields)}")
+
+    def random_datetime_within(self, span: timedelta) -> datetime:
+        """Pick a uniformly random datetime between now - span and now"""
+        return self.now - span * self.random.random()
+
+    def supports_client_bulk_write(self) -> bool:
+        """Check whether the server accepts client-level bulkWrite (MongoDB 8.0+)"""
+        try:
+            return self.client.server_info()['versionArray'][0] >= 8
+        except Exception:
+            return False
+
+    def build_value_pools(self, size: int = FAKER_POOL_SIZE):
+        """
+        Pre-generate the Faker values patients sample from
+
+        Args:
+            size: Number of values in each pool, capped at FAKER_POOL_SIZE
+        """
+        size = max(1, min(FAKER_POOL_SIZE, size))
+        self.addresses = [
+            {
+                "line": [self.fake.street_address()],
+                "city": self.fake.city(),
+                "state": self.fake.state_abbr(),
+                "postalCode": self.fake.zipcode(),
+                "country": "USA"
+            }
+            for _ in range(size)
+        ]
+        self.phone_numbers = [self.fake.phone_number() for _ in range(size)]
+        self.first_names = {
+            'male': [self.fake.first_name_male() for _ in range(size)],
+            'female': [self.fake.first_name_female() for _ in range(size)]
+        }
+        self.last_names = [self.fake.last_name() for _ in range(size)]
+
     def generate_patient_id(self, index: int) -> str:
         """Generate a unique patient ID"""
         return f"{index:03d}"
 
     def generate_patient(self, patient_id: str) -> Dict[str, Any]:
         """Generate a synthetic FHIR Patient resource"""
-        gender = random.choice(['male', 'female'])
-        birth_date = self.fake.date_of_birth(minimum_age=18, maximum_age=90)
+        if self.addresses is None:
+            self.build_value_pools()
 
-        # Generate realistic names based on gender
-        if gender == 'male':
-            first_name = self.fake.first_name_male()
-        else:
-            first_name = self.fake.first_name_female()
+        gender = self.random.choice(['male', 'female'])
+        # Born after the day the patient would turn MAX_PATIENT_AGE + 1, and no
+        # later than their MIN_PATIENT_AGE birthday
+        latest_birth = _years_before(self.now, MIN_PATIENT_AGE)
+        earliest_birth = _years_before(self.now, MAX_PATIENT_AGE + 1) + timedelta(days=1)
+        birth_date = latest_birth - (latest_birth - earliest_birth) * self.random.random()
 
-        last_name = self.fake.last_name()
+        # Generate realistic names based on gender
+        first_name = self.random.choice(self.first_names[gender])
+        last_name = self.random.choice(self.last_names)
 
-        # Generate address
-        address = {
-            "line": [self.fake.street_address()],
-            "city": self.fake.city(),
-            "state": self.fake.state_abbr(),
-            "postalCode": self.fake.zipcode(),
-            "country": "USA"
-        }
+        # Pick a pre-generated address; patients may share one
+        address = self.random.choice(self.addresses)
 
         # Generate telecom
         telecom = [{
             "system": "phone",
-            "value": self.fake.phone_number(),
+            "value": self.random.choice(self.phone_numbers),
             "use": "home"
         }]
 
         # Add mobile phone sometimes
-        if random.random() < 0.7:
+        if self.random.random() < 0.7:
             telecom.append({
                 "system": "phone",
-                "value": self.fake.phone_number(),
+                "value": self.random.choice(self.phone_numbers),
                 "use": "mobile"
             })
 
-        # Generate marital status
-        marital_status_options = [
-            {"coding": [{"system": "http://hl7.org/fhir/v3/MaritalStatus", "code": "S", "display": "Single"}]},
-            {"coding": [{"system": "http://hl7.org/fhir/v3/MaritalStatus", "code": "M", "display": "Married"}]},
-            {"coding": [{"system": "http://hl7.org/fhir/v3/MaritalStatus", "code": "D", "display": "Divorced"}]},
-            {"coding": [{"system": "http://hl7.org/fhir/v3/MaritalStatus", "code": "W", "display": "Widowed"}]}
-        ]
-
         patient = {
             "resourceType": "Patient",
             "id": patient_id,
@@ -220,66 +424,29 @@ class FHIRDataGenerator:
             "birthDate": birth_date.strftime("%Y-%m-%d"),
             "address": [address],
             "telecom": telecom,
-            "maritalStatus": random.choice(marital_status_options),
-            "communication": [{
-                "language": {
-                    "coding": [{
-                        "system": "urn:ietf:bcp:47",
-                        "code": "en-US",
-                        "display": "English (United States)"
-                    }]
-                },
-                "preferred": True
-            }]
+            "maritalStatus": self.random.choice(self.marital_status_options),
+            "communication": self.communication
         }
 
         return patient
 
-    def generate_observation(self, patient_id: str, obs_id: str) -> Dict[str, Any]:
+    def generate_observation(self, patient_id: str, obs_id: str, subject: Dict[str, str] = None) -> Dict[str, Any]:
         """Generate a synthetic FHIR Observation resource"""
         # Choose observation type
-        obs_type = random.choice(['vital', 'lab'])
+        obs_type = self.random.choice(['vital', 'lab'])
         if obs_type == 'vital':
-            code_options = list(self.loinc_codes['vitals'].items())
+            code_options = self.vital_code_options
         else:
-            code_options = list(self.loinc_codes['labs'].items())
+            code_options = self.lab_code_options
 
-        code, display = random.choice(code_options)
+        code, display = self.random.choice(code_options)
 
         # Generate realistic values based on the observation type
-        if code == '8480-6':  # Systolic BP
-            value = random.randint(90, 180)
-            unit = "mmHg"
-        elif code == '8462-4':  # Diastolic BP
-            value = random.randint(60, 110)
-            unit = "mmHg"
-        elif code == '8867-4':  # Heart rate
-            value = random.randint(60, 100)
-            unit = "beats/min"
-        elif code == '39156-5':  # BMI
-            value = round(random.uniform(18.5, 40.0), 1)
-            unit = "kg/m2"
-        elif code == '29463-7':  # Weight
-            value = round(random.uniform(45, 150), 1)
-            unit = "kg"
-        elif code == '8302-2':  # Height
-            value = random.randint(150, 200)
-            unit = "cm"
-        elif code == '2093-3':  # Total cholesterol
-            value = random.randint(120, 300)
-            unit = "mg/dL"
-        elif code == '2085-9':  # HDL
-            value = random.randint(30, 80)
-            unit = "mg/dL"
-        elif code == '2160-0':  # Creatinine
-            value = round(random.uniform(0.5, 2.0), 1)
-            unit = "mg/dL"
-        else:
-            value = round(random.uniform(10, 200), 1)
-            unit = "mg/dL"
+        value_generator, unit = self.observation_value_specs.get(code, self.default_observation_value_spec)
+        value = value_generator()
 
         # Generate effective date (within last year)
-        effective_date = self.fake.date_time_between(start_date='-1y', end_date='now')
+        effective_date = self.random_datetime_within(ONE_YEAR)
 
         observation = {
             "resourceType": "Observation",
@@ -299,10 +466,10 @@ class FHIRDataGenerator:
                     "display": display
                 }]
             },
-            "subject": {
+            "subject": subject or {
                 "reference": f"Patient/{patient_id}"
             },
-            "effectiveDateTime": effective_date.strftime("%Y-%m-%dT%H:%M:%S.%fZ")[:-3] + "Z",
+            "effectiveDateTime": _iso_z(effective_date),
             "valueQuantity": {
                 "value": value,
                 "unit": unit,
@@ -313,19 +480,19 @@ class FHIRDataGenerator:
 
         return observation
 
-    def generate_condition(self, patient_id: str, condition_id: str) -> Dict[str, Any]:
+    def generate_condition(self, patient_id: str, condition_id: str, subject: Dict[str, str] = None) -> Dict[str, Any]:
         """Generate a synthetic FHIR Condition resource"""
-        condition_codes = list(self.snomed_codes['conditions'].items())
-        code, display = random.choice(condition_codes)
+        code, display = self.random.choice(self.condition_code_options)
 
         # Generate onset date (within last 5 years)
-        onset_date = self.fake.date_time_between(start_date='-5y', end_date='now')
+        onset_date = self.random_datetime_within(FIVE_YEARS)
+        onset = _iso_z(onset_date)
 
         # Determine clinical status
-        clinical_status = random.choice(['active', 'resolved', 'inactive'])
+        clinical_status = self.random.choice(['active', 'resolved', 'inactive'])
 
         # Determine verification status
-        verification_status = random.choice(['confirmed', 'provisional'])
+        verification_status = self.random.choice(['confirmed', 'provisional'])
 
         condition = {
             "resourceType": "Condition",
@@ -354,8 +521,8 @@ class FHIRDataGenerator:
             "severity": {
                 "coding": [{
                     "system": "http://snomed.info/sct",
-                    "code": random.choice(["24484000", "6736007", "255604002"]),
-                    "display": random.choice(["Severe", "Moderate", "Mild"])
+                    "code": self.random.choice(["24484000", "6736007", "255604002"]),
+                    "display": self.random.choice(["Severe", "Moderate", "Mild"])
                 }]
             },
             "code": {
@@ -365,26 +532,27 @@ class FHIRDataGenerator:
                     "display": display
                 }]
             },
-            "subject": {
+            "subject": subject or {
                 "reference": f"Patient/{patient_id}"
             },
-            "onsetDateTime": onset_date.strftime("%Y-%m-%dT%H:%M:%S.%fZ")[:-3] + "Z",
-            "recordedDate": onset_date.strftime("%Y-%m-%dT%H:%M:%S.%fZ")[:-3] + "Z"
+            "onsetDateTime": onset,
+            "recordedDate": onset
         }
 
         return condition
 
-    def generate_medication_request(self, patient_id: str, med_id: str) -> Dict[str, Any]:
+    def generate_medication_request(self, patient_id: str, med_id: str, subject: Dict[str, str] = None,
+                                    requester: Dict[str, str] = None,
+                                    encounter: Dict[str, str] = None) -> Dict[str, Any]:
         """Generate a synthetic FHIR MedicationRequest resource"""
-        medication_codes = list(self.rxnorm_codes.items())
-        code, display = random.choice(medication_codes)
+        code, display = self.random.choice(self.medication_code_options)
 
         # Generate authored date (within last 6 months)
-        authored_date = self.fake.date_time_between(start_date='-6M', end_date='now')
+        authored_date = self.random_datetime_within(SIX_MONTHS)
 
         # Generate dosage based on medication type
         if 'Tablet' in display:
-            dose_value = random.choice([10, 25, 50, 100, 200])
+            dose_value = self.random.choice([10, 25, 50, 100, 200])
             dose_unit = "mg"
         elif 'Inhaler' in display:
             dose_value = 2
@@ -399,7 +567,7 @@ class FHIRDataGenerator:
         medication_request = {
             "resourceType": "MedicationRequest",
             "id": med_id,
-            "status": random.choice(["active", "completed", "cancelled"]),
+            "status": self.random.choice(["active", "completed", "cancelled"]),
             "intent": "order",
             "medicationCodeableConcept": {
                 "coding": [{
@@ -408,15 +576,15 @@ class FHIRDataGenerator:
                     "display": display
                 }]
             },
-            "subject": {
+            "subject": subject or {
                 "reference": f"Patient/{patient_id}"
             },
-            "encounter": {
-                "reference": f"Encounter/enc-{patient_id.replace('pat-', '')}"
+            "encounter": encounter or {
+                "reference": f"Encounter/enc-{patient_id}"
             },
-            "authoredOn": authored_date.strftime("%Y-%m-%dT%H:%M:%S.%fZ")[:-3] + "Z",
-            "requester": {
-                "reference": f"Practitioner/pract-{patient_id.replace('pat-', '')}"
+            "authoredOn": _iso_z(authored_date),
+            "requester": requester or {
+                "reference": f"Practitioner/pract-{patient_id}"
             },
             "dosageInstruction": [{
                 "text": f"Take {dose_value} {dose_unit} by mouth once daily",
@@ -437,9 +605,9 @@ class FHIRDataGenerator:
                 }]
             }],
             "dispenseRequest": {
-                "numberOfRepeatsAllowed": random.randint(1, 5),
+                "numberOfRepeatsAllowed": self.random.randint(1, 5),
                 "quantity": {
-                    "value": random.randint(10, 90),
+                    "value": self.random.randint(10, 90),
                     "unit": "tablets",
                     "system": "http://unitsofmeasure.org",
                     "code": "{tbl}"
@@ -449,20 +617,20 @@ class FHIRDataGenerator:
 
         return medication_request
 
-    def generate_encounter(self, patient_id: str, encounter_id: str) -> Dict[str, Any]:
+    def generate_encounter(self, patient_id: str, encounter_id: str, subject: Dict[str, str] = None,
+                           practitioner: Dict[str, str] = None) -> Dict[str, Any]:
         """Generate a synthetic FHIR Encounter resource"""
-        encounter_codes = list(self.snomed_codes['encounters'].items())
-        code, display = random.choice(encounter_codes)
+        code, display = self.random.choice(self.encounter_code_options)
 
         # Generate encounter period
-        start_date = self.fake.date_time_between(start_date='-1y', end_date='now')
-        duration_hours = random.randint(15, 120)  # 15 minutes to 2 hours
-        end_date = start_date + timedelta(minutes=duration_hours)
+        start_date = self.random_datetime_within(ONE_YEAR)
+        duration = self.random.choice(self.encounter_durations)
+        end_date = start_date + duration
 
         encounter = {
             "resourceType": "Encounter",
             "id": encounter_id,
-            "status": random.choice(["finished", "in-progress", "cancelled"]),
+            "status": self.random.choice(["finished", "in-progress", "cancelled"]),
             "class": {
                 "system": "http://terminology.hl7.org/CodeSystem/v3-ActCode",
                 "code": "AMB",
@@ -475,23 +643,23 @@ class FHIRDataGenerator:
                     "display": display
                 }]
             }],
-            "subject": {
+            "subject": subject or {
                 "reference": f"Patient/{patient_id}"
             },
             "participant": [{
-                "individual": {
-                    "reference": f"Practitioner/pract-{patient_id.replace('pat-', '')}"
+                "individual": practitioner or {
+                    "reference": f"Practitioner/pract-{patient_id}"
                 }
             }],
             "period": {
-                "start": start_date.strftime("%Y-%m-%dT%H:%M:%S.%fZ")[:-3] + "Z",
-                "end": end_date.strftime("%Y-%m-%dT%H:%M:%S.%fZ")[:-3] + "Z"
+                "start": _iso_z(start_date),
+                "end": _iso_z(end_date)
             },
             "reasonCode": [{
                 "coding": [{
                     "system": "http://snomed.info/sct",
-                    "code": random.choice(list(self.snomed_codes['conditions'].keys())),
-                    "display": random.choice(list(self.snomed_codes['conditions'].values()))
+                    "code": self.random.choice(self.condition_codes),
+                    "display": self.random.choice(self.condition_displays)
                 }]
             }],
             "serviceProvider": {
@@ -501,99 +669,291 @@ class FHIRDataGenerator:
 
         return encounter
 
-    def generate_all_data(self, num_patients: int = 300):
+    def generate_patient_bundle(self, index: int) -> tuple:
+        """
+        Generate one patient together with all of its associated resources
+
+        Args:
+            index: 1-based patient number
+
+        Returns:
+            Lists of documents in COLLECTION_LABELS order: the patient,
+            observations, conditions, medication requests and encounters
+        """
+        patient_id = self.generate_patient_id(index)
+        patient = self.generate_patient(patient_id)
+
+        # References shared by every resource of this patient; documents are
+        # encoded on insert and never mutated, so one dict can be reused
+        subject = {"reference": f"Patient/{patient_id}"}
+        practitioner = {"reference": f"Practitioner/pract-{patient_id}"}
+        encounter = {"reference": f"Encounter/enc-{patient_id}"}
+
+        # Observations (2-5 per patient)
+        num_obs = self.random.randint(2, 5)
+        observations = [
+            self.generate_observation(patient_id, f"obs-{patient_id}-{j+1}", subject)
+            for j in range(num_obs)
+        ]
+
+        # Conditions (0-3 per patient)
+        num_conditions = self.random.randint(0, 3)
+        conditions = [
+            self.generate_condition(patient_id, f"cond-{patient_id}-{j+1}", subject)
+            for j in range(num_conditions)
+        ]
+
+        # Medication requests (0-4 per patient)
+        num_meds = self.random.randint(0, 4)
+        medication_requests = [
+            self.generate_medication_request(patient_id, f"medreq-{patient_id}-{j+1}", subject,
+                                             practitioner, encounter)
+            for j in range(num_meds)
+        ]
+
+        # Encounters (1-3 per patient)
+        num_encounters = self.random.randint(1, 3)
+        encounters = [
+            self.generate_encounter(patient_id, f"enc-{patient_id}-{j+1}", subject, practitioner)
+            for j in range(num_encounters)
+        ]
+
+        return [patient], observations, conditions, medication_requests, encounters
+
+    def generate_all_data(self, num_patients: int = 300, workers: int = 1,
+                          batch_size: int = INSERT_BATCH_SIZE):
         """
         Generate comprehensive synthetic FHIR medical data
 
+        Resources are streamed into MongoDB: each collection's buffer is
+        flushed once it reaches batch_size documents, so memory stays
+        bounded by the batch size rather than the number of patients. Flushed
+        batches are inserted on a thread pool while generation continues,
+        with at most MAX_PENDING_BATCHES outstanding at a time.
+        On MongoDB 8.0+, all five buffers are flushed together with a single
+        client-level bulk write once they hold batch_size documents.
+
         Args:
             num_patients: Number of patients to generate
+            workers: Number of processes generating patient bundles
+            batch_size: Documents buffered before an insert is issued
         """
         print(f"🚀 Starting generation of {num_patients} patients with associated medical data...")
 
-        patients = []
-        observations = []
-        conditions = []
-        medication_requests = []
-        encounters = []
-
-        # Generate patients
-        print("📝 Generating patients...")
-        for i in range(1, num_patients + 1):
-            patient_id = self.generate_patient_id(i)
-            patient = self.generate_patient(patient_id)
-            patients.append(patient)
-
-            # Generate associated data for each patient
-            # Observations (2-5 per patient)
-            num_obs = random.randint(2, 5)
-            for j in range(num_obs):
-                obs_id = f"obs-{i:03d}-{j+1}"
-                observation = self.generate_observation(patient_id, obs_id)
-                observations.append(observation)
-
-            # Conditions (0-3 per patient)
-            num_conditions = random.randint(0, 3)
-            for j in range(num_conditions):
-                condition_id = f"cond-{i:03d}-{j+1}"
-                condition = self.generate_condition(patient_id, condition_id)
-                conditions.append(condition)
-
-            # Medication requests (0-4 per patient)
-            num_meds = random.randint(0, 4)
-            for j in range(num_meds):
-                med_id = f"medreq-{i:03d}-{j+1}"
-                med_request = self.generate_medication_request(patient_id, med_id)
-                medication_requests.append(med_request)
-
-            # Encounters (1-3 per patient)
-            num_encounters = random.randint(1, 3)
-            for j in range(num_encounters):
-                encounter_id = f"enc-{i:03d}-{j+1}"
-                encounter = self.generate_encounter(patient_id, encounter_id)
-                encounters.append(encounter)
-
-        # Insert data into MongoDB
-        print("💾 Inserting data into MongoDB...")
-
-        if patients:
-            self.db.patients.insert_many(patients)
-            print(f"✅ Inserted {len(patients)} patients")
-
-        if observations:
-            self.db.observations.insert_many(observations)
-            print(f"✅ Inserted {len(observations)} observations")
-
-        if conditions:
-            self.db.conditions.insert_many(conditions)
-            print(f"✅ Inserted {len(conditions)} conditions")
-
-        if medication_requests:
-            self.db.medication_requests.insert_many(medication_requests)
-            print(f"✅ Inserted {len(medication_requests)} medication requests")
-
-        if encounters:
-            self.db.encounters.insert_many(encounters)
-            print(f"✅ Inserted {len(encounters)} encounters")
+        # Dates are relative to the start of this run, not to when the
+        # generator was created
+        self.now = datetime.now()
+
+        buffers = {collection_name: [] for collection_name in COLLECTION_LABELS}
+        self.insert_stats = {
+            collection_name: {'generated': 0, 'inserted': 0, 'failed': 0, 'first_error': None}
+            for collection_name in COLLECTION_LABELS
+        }
+        self._stats_lock = threading.Lock()
+        self._insert_slots = threading.BoundedSemaphore(MAX_PENDING_BATCHES)
+        self._insert_error = None
+
+        use_client_bulk_write = self.supports_client_bulk_write()
+        if use_client_bulk_write:
+            print("⚙️  Using client-level bulk writes across collections (MongoDB 8.0+)")
+
+        # The process pool is started before any insert thread exists so
+        # forked workers never inherit a held lock
+        pool = None
+        if workers > 1:
+            print(f"⚙️  Generating with {workers} worker processes")
+            pool = multiprocessing.Pool(workers, initializer=_init_bundle_worker,
+                                        initargs=(self.random.randrange(2 ** 32), num_patients))
+            bundles = pool.imap_unordered(_generate_patient_bundle, range(1, num_patients + 1),
+                                          chunksize=BUNDLE_CHUNK_SIZE)
+        else:
+            self.build_value_pools(num_patients)
+            bundles = (_encode_bundle(self.generate_patient_bundle(i)) for i in range(1, num_patients + 1))
+
+        # Generate patients, inserting as buffers fill
+        print("📝 Generating patients and streaming them into MongoDB...")
+        completed = False
+        try:
+            with ThreadPoolExecutor(max_workers=INSERT_WORKERS) as executor:
+                for bundle in bundles:
+                    # Stop generating as soon as an insert has failed outright
+                    if self._insert_error is not None:
+                        break
+                    for (collection_name, buffer), documents in zip(buffers.items(), bundle):
+                        buffer.extend(documents)
+                        if not use_client_bulk_write and len(buffer) >= batch_size:
+                            self._flush_buffer(collection_name, buffer, executor)
+                    if use_client_bulk_write and sum(map(len, buffers.values())) >= batch_size:
+                        self._flush_buffers(buffers, executor)
+
+                if self._insert_error is not None:
+                    # Queued batches would only fail the same way
+                    executor.shutdown(cancel_futures=True)
+                elif use_client_bulk_write:
+                    # Insert whatever is left in the buffers
+                    self._flush_buffers(buffers, executor)
+                else:
+                    for collection_name, buffer in buffers.items():
+                        self._flush_buffer(collection_name, buffer, executor)
+            completed = self._insert_error is None
+        finally:
+            if pool is not None:
+                if completed:
+                    pool.close()
+                else:
+                    # Don't wait for the remaining bundles to be generated
+                    pool.terminate()
+                pool.join()
+
+        # Surface any failure other than per-document write errors
+        if self._insert_error is not None:
+            raise self._insert_error
+
+        for collection_name, stats in self.insert_stats.items():
+            label = COLLECTION_LABELS[collection_name]
+            if stats['failed']:
+                print(f"⚠️  Inserted {stats['inserted']} {label}, {stats['failed']} failed: {stats['first_error']}")
+            elif stats['inserted']:
+                print(f"✅ Inserted {stats['inserted']} {label}")
 
         print("🎉 Synthetic FHIR medical data generation completed!")
         print(f"📊 Summary:")
-        print(f"   • Patients: {len(patients)}")
-        print(f"   • Observations: {len(observations)}")
-        print(f"   • Conditions: {len(conditions)}")
-        print(f"   • Medication Requests: {len(medication_requests)}")
-        print(f"   • Encounters: {len(encounters)}")
+        print(f"   • Patients: {self.insert_stats['patients']['generated']}")
+        print(f"   • Observations: {self.insert_stats['observations']['generated']}")
+        print(f"   • Conditions: {self.insert_stats['conditions']['generated']}")
+        print(f"   • Medication Requests: {self.insert_stats['medication_requests']['generated']}")
+        print(f"   • Encounters: {self.insert_stats['encounters']['generated']}")
 
-    def run(self, num_patients: int = 300):
+    def _flush_buffer(self, collection_name: str, buffer: List[Dict[str, Any]], executor: ThreadPoolExecutor):
+        """
+        Hand a buffer of documents to the insert pool and clear it
+
+        The documents are copied out so the generator can keep filling the
+        buffer while the batch is being written.
+        """
+        if buffer:
+            self._submit_insert(executor, self._insert_batch, collection_name, buffer[:])
+            buffer.clear()
+
+    def _insert_batch(self, collection_name: str, documents: List[Dict[str, Any]]):
+        """
+        Insert one batch with an unordered insert_many
+
+        Unordered inserts let the server apply writes without a serial
+        dependency; write errors are recorded without aborting the load of
+        the remaining collections.
+        """
+        inserted = len(documents)
+        errors = []
+        try:
+            self.db[collection_name].insert_many(documents, ordered=False, bypass_document_validation=True)
+        except BulkWriteError as e:
+            errors = e.details.get('writeErrors', [])
+            inserted = e.details.get('nInserted', 0)
+
+        self._record_insert(collection_name, len(documents), inserted, errors)
+
+    def _flush_buffers(self, buffers: Dict[str, List[Dict[str, Any]]], executor: ThreadPoolExecutor):
+        """Hand every non-empty buffer to the insert pool as one client bulk write and clear them"""
+        batches = {collection_name: buffer[:] for collection_name, buffer in buffers.items() if buffer}
+        if batches:
+            for buffer in buffers.values():
+                buffer.clear()
+            self._submit_insert(executor, self._insert_client_batch, batches)
+
+    def _submit_insert(self, executor: ThreadPoolExecutor, insert, *args):
+        """Submit an insert once fewer than MAX_PENDING_BATCHES are outstanding"""
+        self._insert_slots.acquire()
+        future = executor.submit(insert, *args)
+        future.add_done_callback(self._insert_done)
+
+    def _insert_done(self, future):
+        """Free the batch's slot and keep the first unexpected insert failure"""
+        error = None if future.cancelled() else future.exception()
+        if error is not None:
+            with self._stats_lock:
+                if self._insert_error is None:
+                    self._insert_error = error
+        self._insert_slots.release()
+
+    def _insert_client_batch(self, batches: Dict[str, List[Dict[str, Any]]]):
+        """
+        Insert documents for several collections with one MongoClient.bulk_write
+
+        The whole batch goes to the server in a single bulkWrite command
+        instead of one insert per collection. Write errors are attributed
+        back to their collection through the operation index.
+        """
+        models = []
+        owners = []
+        for collection_name, documents in batches.items():
+            namespace = f"{self.db.name}.{collection_name}"
+            models.extend(InsertOne(document, namespace=namespace) for document in documents)
+            owners.extend([collection_name] * len(documents))
+
+        errors = []
+        failure = None
+        try:
+            result = self.client.bulk_write(models, ordered=False, bypass_document_validation=True,
+                                            write_concern=self.db.write_concern)
+        except ClientBulkWriteException as e:
+            errors = e.write_errors or []
+            result = e.partial_result
+            # A top-level error or write concern error means the batch did
+            # not complete; fail the run like the insert_many path does
+            if e.error is not None or e.write_concern_errors:
+                failure = e
+
+        # The driver sends operations in order, so what the server applied
+        # is a prefix of the batch minus the individual write errors
+        remaining = result.inserted_count if result is not None and result.acknowledged else 0
+        failed_indexes = {error['idx'] for error in errors}
+        inserted = dict.fromkeys(batches, 0)
+        for index, collection_name in enumerate(owners):
+            if not remaining:
+                break
+            if index not in failed_indexes:
+                inserted[collection_name] += 1
+                remaining -= 1
+
+        errors_by_collection = {collection_name: [] for collection_name in batches}
+        for error in errors:
+            errors_by_collection[owners[error['idx']]].append(error)
+        for collection_name, documents in batches.items():
+            self._record_insert(collection_name, len(documents), inserted[collection_name],
+                                errors_by_collection[collection_name])
+
+        if failure is not None:
+            raise failure
+
+    def _record_insert(self, collection_name: str, generated: int, inserted: int, errors: List[Dict[str, Any]]):
+        """Add the outcome of one insert batch to the collection's statistics"""
+        with self._stats_lock:
+            stats = self.insert_stats[collection_name]
+            stats['generated'] += generated
+            stats['inserted'] += inserted
+            stats['failed'] += len(errors)
+            if errors and stats['first_error'] is None:
+                stats['first_error'] = errors[0].get('errmsg')
+
+    def run(self, num_patients: int = 300, workers: int = 1, batch_size: int = INSERT_BATCH_SIZE):
         """Main execution method"""
         try:
             print("🔌 Connecting to MongoDB...")
             self.connect_to_mongodb()
 
+            # The pure-Python BSON fallback is several times slower to encode
+            if not (pymongo.has_c() and bson.has_c()):
+                print("⚠️  pymongo C extensions are not available; reinstall pymongo from a wheel for faster inserts")
+
             print("🗑️ Clearing existing data...")
             self.clear_all_data()
 
             print("🏥 Generating synthetic FHIR medical data...")
-            self.generate_all_data(num_patients)
+            self.generate_all_data(num_patients, workers, batch_size)
+
+            print("📇 Creating indexes...")
+            self.create_indexes()
 
             print("✅ All operations completed successfully!")
 
@@ -606,6 +966,32 @@ class FHIRDataGenerator:
                 print("🔌 MongoDB connection closed")
 
 
+_bundle_generator = None
+_bundle_seed = 0
+
+
+def _init_bundle_worker(seed: int, pool_size: int):
+    """Create the generator used by a worker process"""
+    global _bundle_generator, _bundle_seed
+    # Seed Faker before the value pools are built so every worker shares them
+    Faker.seed(seed)
+    _bundle_generator = FHIRDataGenerator(seed=seed)
+    _bundle_generator.build_value_pools(pool_size)
+    _bundle_seed = seed
+
+
+def _generate_patient_bundle(index: int) -> tuple:
+    """
+    Generate one patient bundle in a worker process
+
+    The generator's random source is re-seeded per patient, and Faker is
+    only used to build the shared value pools, so a bundle does not depend
+    on which worker produced it or in what order.
+    """
+    _bundle_generator.random.seed(_bundle_seed + index)
+    return _encode_bundle(_bundle_generator.generate_patient_bundle(index))
+
+
 def main():
     """Main function with improved configuration"""
     print("🏥 Synthetic FHIR Medical Data Generator")
@@ -650,10 +1036,26 @@ def main():
         print("❌ Invalid number, using default: 300")
         NUM_PATIENTS = 300
 
+    # Generator processes; defaults to one per CPU core
+    try:
+        WORKERS = max(1, int(os.getenv('GENERATOR_WORKERS', os.cpu_count() or 1)))
+    except ValueError:
+        print("❌ Invalid GENERATOR_WORKERS, using a single process")
+        WORKERS = 1
+
+    # Documents per insert batch
+    try:
+        BATCH_SIZE = max(1, int(os.getenv('INSERT_BATCH_SIZE', INSERT_BATCH_SIZE)))
+    except ValueError:
+        print(f"❌ Invalid INSERT_BATCH_SIZE, using default: {INSERT_BATCH_SIZE}")
+        BATCH_SIZE = INSERT_BATCH_SIZE
+
     print(f"\n⚙️  Configuration:")
     print(f"   • MongoDB URI: {MONGO_URI.replace(MONGO_URI.split('@')[0].split('//')[1] if '@' in MONGO_URI else '', '***:***@') if '@' in MONGO_URI else MONGO_URI}")
     print(f"   • Database: {DATABASE_NAME}")
     print(f"   • Patients to generate: {NUM_PATIENTS}")
+    print(f"   • Generator processes: {WORKERS}")
+    print(f"   • Insert batch size: {BATCH_SIZE}")
 
     confirm = input("\n🚨 This will DELETE ALL existing data in the database. Continue? (y/N): ").strip().lower()
     if confirm not in ['y', 'yes']:
@@ -667,7 +1069,7 @@ def main():
             database_name=DATABASE_NAME
         )
 
-        generator.run(num_patients=NUM_PATIENTS)
+        generator.run(num_patients=NUM_PATIENTS, workers=WORKERS, batch_size=BATCH_SIZE)
         print("\n🎉 Synthetic FHIR medical data generation completed successfully!")
 
     except Exception as e: